@@ -1,44 +1,153 @@
-from typing import List, Optional, Dict, Any
+import asyncio
+import re
+import string
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Optional, Dict, Any, Mapping, Sequence
 from motor.motor_asyncio import AsyncIOMotorCollection
 from pymongo import ASCENDING, DESCENDING
-import random
+from pymongo.collation import Collation, CollationStrength
 
 # from app.database import country_collection  # type: AsyncIOMotorCollection
-from app.database import country_collection, convert_mongo_doc  # type: AsyncIOMotorCollection
+from app.crud_cache import cached, single_flight
+from app.database import country_collection  # type: AsyncIOMotorCollection
 
 
 # Utility to build projection dict from comma-separated fields
-def _build_projection(fields: Optional[str]) -> Optional[Dict[str, int]]:
+# (called once per request by the routes' fields dependency)
+@lru_cache(maxsize=512)
+def build_projection(fields: Optional[str]) -> Mapping[str, int]:
     """
     Convert comma-separated field names into a MongoDB projection dictionary.
 
+    `_id` is excluded unless it is explicitly requested, as clients rarely need it,
+    and the derived lookup fields are hidden when no fields are requested.
+    Results are cached per `fields` string and shared between requests, so the
+    returned mapping is read-only; copy it before adding keys.
+
     Args:
         fields: Comma-separated string of field names to include in the result
 
     Returns:
-        Dict mapping field names to 1 (include) or None if fields is None
+        Read-only mapping of field names to 1 (include) or 0 (exclude)
     """
-    if not fields:
-        return None
-    projection = {}
-    for f in fields.split(","):
-        projection[f.strip()] = 1
-    return projection
+    # stray commas and blanks ("name,,region ") would otherwise become empty field paths
+    names = [f.strip() for f in fields.split(",") if f.strip()] if fields else []
+    if not names:
+        return MappingProxyType({"_id": 0, "codes": 0, "densityPerKm2": 0, "name_lower": 0, "capital_lower": 0, "demonym_lower": 0})
+    projection = dict.fromkeys(names, 1)
+    if "_id" not in projection:
+        projection["_id"] = 0
+    return MappingProxyType(projection)
 
 
-async def get_all_countries(
-    fields: Optional[str],
+# Every country fits in one batch, so a full read needs no getMore round trips
+_BATCH_SIZE = 500
+
+
+async def _collect(cursor, length: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Read a cursor into a list, fetching large batches from the server.
+
+    Args:
+        cursor: Motor find or aggregate cursor
+        length: Maximum number of documents to read, or None for all
+
+    Returns:
+        List of documents
+    """
+    return await cursor.batch_size(_BATCH_SIZE).to_list(length)
+
+
+# Mirrors MongoDB's $toLower, which only folds ASCII letters
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+
+def _lower(value: str) -> str:
+    """Lower-case a value the same way the stored *_lower fields were."""
+    return value.translate(_ASCII_LOWER)
+
+
+def _build_regex(value: str, prefix: bool = False) -> Dict[str, str]:
+    """
+    Build a MongoDB regex condition for one of the lower-cased *_lower fields.
+
+    The value is lower-cased instead of passing the "i" option, since a
+    case-insensitive regex cannot use an index efficiently.
+
+    Args:
+        value: User supplied text; regex metacharacters are escaped
+        prefix: Anchor the pattern with "^" so MongoDB can use an index range scan
+
+    Returns:
+        Dict usable as the condition of a field in a MongoDB query
+    """
+    pattern = re.escape(_lower(value))
+    if prefix:
+        pattern = f"^{pattern}"
+    return {"$regex": pattern}
+
+
+def _aggregate_paged(
+    match: Optional[Dict[str, Any]] = None,
+    sort: Optional[Dict[str, Any]] = None,
+    skip: int = 0,
+    limit: int = 0,
+    add_fields: Optional[Dict[str, Any]] = None,
+    project: Optional[Mapping[str, Any]] = None,
+    sort_keys: Optional[Dict[str, Any]] = None,
+):
+    """
+    Run an aggregation whose stages are always emitted in optimizer-friendly order.
+
+    The order is $match, $sort, $skip, $limit, $addFields, $project, so filtering and
+    top-k sorting can use indexes before any documents are reshaped. The only stage
+    allowed ahead of $sort is the $addFields for `sort_keys`, since $sort cannot sort
+    on an expression.
+
+    Args:
+        match: Query filter for the $match stage
+        sort: Sort specification for the $sort stage
+        skip: Number of documents to skip (0 to disable)
+        limit: Maximum number of documents to return (0 to disable)
+        add_fields: Computed fields added after sorting and paging
+        project: Projection for the final $project stage
+        sort_keys: Computed fields that `sort` refers to
+
+    Returns:
+        Cursor over the aggregated documents
+    """
+    pipeline: List[Dict[str, Any]] = []
+    if match:
+        pipeline.append({"$match": match})
+    if sort:
+        if sort_keys:
+            pipeline.append({"$addFields": sort_keys})
+        pipeline.append({"$sort": sort})
+    if skip:
+        pipeline.append({"$skip": skip})
+    if limit:
+        pipeline.append({"$limit": limit})
+    if add_fields:
+        pipeline.append({"$addFields": add_fields})
+    if project:
+        pipeline.append({"$project": project})
+    return country_collection.aggregate(pipeline)
+
+
+def find_all_countries(
+    projection: Mapping[str, int],
     sort: Optional[str],
     unMember: Optional[bool],
     independent: Optional[bool],
     limit: int,
     skip: int,
-) -> List[Dict[str, Any]]:
+):
     """
-    Retrieve countries with optional filtering, sorting, and pagination.
+    Find countries with optional filtering, sorting, and pagination.
 
     Args:
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
         sort: Field to sort by (prefix with "-" for descending order)
         unMember: Filter by UN membership status
         independent: Filter by independence status
@@ -46,7 +155,7 @@ async def get_all_countries(
         skip: Number of countries to skip (for pagination)
 
     Returns:
-        List of country documents matching the criteria
+        Cursor over country documents matching the criteria
     """
     query: Dict[str, Any] = {}
     if unMember is not None:
@@ -54,7 +163,6 @@ async def get_all_countries(
     if independent is not None:
         query["independent"] = independent
 
-    projection = _build_projection(fields)
     cursor = country_collection.find(query, projection)
     # apply sort
     if sort:
@@ -62,240 +170,239 @@ async def get_all_countries(
         field = sort.lstrip("-")
         cursor = cursor.sort(field, direction)
     # apply pagination
-    cursor = cursor.skip(skip).limit(limit)
-    # return cursor.to_list(length=limit)
-    results = await cursor.to_list(length=limit)
-    return [convert_mongo_doc(doc) for doc in results]
+    return cursor.skip(skip).limit(limit)
+
+
+@cached(ttl=3600, maxsize=32)
+async def get_all_countries(
+    projection: Mapping[str, int],
+    sort: Optional[str],
+    unMember: Optional[bool],
+    independent: Optional[bool],
+    limit: int,
+    skip: int,
+) -> List[Dict[str, Any]]:
+    """
+    Retrieve countries with optional filtering, sorting, and pagination, as a cached list.
+
+    Args:
+        See `find_all_countries`
+
+    Returns:
+        List of country documents matching the criteria
+    """
+    cursor = find_all_countries(projection, sort, unMember, independent, limit, skip)
+    return await _collect(cursor, limit)
 
 
-async def get_country_by_id(id: str, fields: Optional[str]) -> Optional[Dict[str, Any]]:
+async def get_country_by_id(id: str, projection: Mapping[str, int]) -> Optional[Dict[str, Any]]:
     """
     Find a country by its unique ID.
 
     Args:
         id: Unique identifier of the country document
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
         Country document if found, None otherwise
     """
     query = {"_id": id}
-    projection = _build_projection(fields)
-    # return await country_collection.find_one(query, projection)
-    doc = await country_collection.find_one(query, projection)
-    return convert_mongo_doc(doc) if doc else None
+    return await country_collection.find_one(query, projection)
 
 
 # Apply similar changes to all functions that return MongoDB documents
-async def get_country_by_code(code: str, fields: Optional[str]) -> Optional[Dict[str, Any]]:
+async def get_country_by_code(code: str, projection: Mapping[str, int]) -> Optional[Dict[str, Any]]:
     """
     Find a country by its code (alpha2, alpha3, numeric, or CIOC).
 
     Args:
         code: Country code to search for
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
         Country document if found, None otherwise
     """
-    # search multiple code fields
-    query = {"$or": [
-        {"alpha2Code": code.upper()},
-        {"alpha3Code": code.upper()},
-        {"numericCode": code},
-        {"cioc": code.upper()},
-    ]}
-    projection = _build_projection(fields)
-    # return await country_collection.find_one(query, projection)
-    doc = await country_collection.find_one(query, projection)
-    return convert_mongo_doc(doc) if doc else None
+    # "codes" holds alpha2Code, alpha3Code, numericCode and cioc
+    query = {"codes": code.upper()}
+    return await country_collection.find_one(query, projection)
 
 
-async def search_countries(
+def search_countries(
     q: str,
-    fields: Optional[str],
+    projection: Mapping[str, int],
     exact: bool = False,
-) -> List[Dict[str, Any]]:
+):
     """
     Search for countries by name (official or native).
 
     Args:
         q: Name or partial name to search for
-        fields: Comma-separated list of fields to include in the result
-        exact: Whether to perform exact match (True) or case-insensitive partial match (False)
+        projection: MongoDB projection built from the requested fields
+        exact: Whether to perform exact match (True, ignoring case of the English name) or full-text search ranked by relevance (False)
 
     Returns:
-        List of countries matching the search criteria
+        Cursor over countries matching the search criteria
     """
     if exact:
-        query = {"$or": [{"name": q}, {"nativeName": q}]}
+        query = {"$or": [{"name_lower": _lower(q)}, {"nativeName": q}]}
+        cursor = country_collection.find(query, projection)
     else:
-        regex = {"$regex": q, "$options": "i"}
-        query = {"$or": [{"name": regex}, {"nativeName": regex}]}
-    projection = _build_projection(fields)
-    cursor = country_collection.find(query, projection)
-    results = await cursor.to_list(length=1000)
-    return [convert_mongo_doc(doc) for doc in results]
+        # served by the "country_text" index over name, nativeName and altSpellings
+        query = {"$text": {"$search": q}}
+        projection = dict(projection)
+        projection["score"] = {"$meta": "textScore"}
+        cursor = country_collection.find(query, projection)
+        cursor = cursor.sort([("score", {"$meta": "textScore"})]).limit(1000)
+    return cursor
 
 
 # Simple filters by single field equality or regex
-async def filter_by_capital(capital: str, fields: Optional[str]):
+def filter_by_capital(capital: str, projection: Mapping[str, int], prefix: bool = False):
     """
     Find countries by capital city name (partial, case-insensitive match).
 
     Args:
         capital: Capital city name pattern to search for
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
+        prefix: Whether the capital must start with the pattern (True) or may contain it anywhere (False)
 
     Returns:
-        List of countries matching the capital city pattern
+        Cursor over countries matching the capital city pattern
     """
-    query = {"capital": {"$regex": capital, "$options": "i"}}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    query = {"capital_lower": _build_regex(capital, prefix)}
+    return country_collection.find(query, projection)
 
 
-async def filter_by_region(region: str, fields: Optional[str]):
+@cached(ttl=3600)
+async def filter_by_region(region: str, projection: Mapping[str, int]):
     """
     Find countries in a specific region.
 
     Args:
         region: Region name to filter by
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
         List of countries in the specified region
     """
     query = {"region": region}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return await _collect(country_collection.find(query, projection))
 
 
-async def filter_by_subregion(subregion: str, fields: Optional[str]):
+@single_flight
+async def filter_by_subregion(subregion: str, projection: Mapping[str, int]):
     """
     Find countries in a specific subregion.
 
     Args:
         subregion: Subregion name to filter by
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
         List of countries in the specified subregion
     """
     query = {"subregion": subregion}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return await _collect(country_collection.find(query, projection))
 
 
-async def filter_by_border(code: str, fields: Optional[str]):
+def filter_by_border(code: str, projection: Mapping[str, int]):
     """
     Find countries that border a specific country.
 
     Args:
         code: Alpha-3 country code to find neighboring countries
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
-        List of countries bordering the specified country
+        Cursor over countries bordering the specified country
     """
     query = {"borders": code.upper()}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return country_collection.find(query, projection)
 
 
-async def filter_landlocked(fields: Optional[str]):
+@cached(ttl=3600)
+async def filter_landlocked(projection: Mapping[str, int]):
     """
     Find all landlocked countries (countries without access to the ocean).
 
     Args:
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
         List of landlocked countries
     """
     query = {"landlocked": True}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return await _collect(country_collection.find(query, projection))
 
 
-async def filter_by_currency(currency: str, fields: Optional[str]):
+@single_flight
+async def filter_by_currency(currency: str, projection: Mapping[str, int]):
     """
     Find countries using a specific currency.
 
     Args:
         currency: Currency code to filter by
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
         List of countries using the specified currency
     """
     query = {"currencies.code": currency.upper()}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return await _collect(country_collection.find(query, projection))
 
 
-async def filter_by_language(language: str, fields: Optional[str]):
+@single_flight
+async def filter_by_language(language: str, projection: Mapping[str, int]):
     """
     Find countries using a specific language.
 
     Args:
         language: ISO639-1 language code to filter by
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
         List of countries using the specified language
     """
     query = {"languages.iso639_1": language.lower()}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return await _collect(country_collection.find(query, projection))
 
 
-async def filter_by_translation(translation: str, fields: Optional[str]):
+def filter_by_translation(translation: str, projection: Mapping[str, int]):
     """
     Find countries that have a translation in a specific language.
 
     Args:
         translation: Translation language key to filter by
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
-        List of countries with translations in the specified language
+        Cursor over countries with translations in the specified language
     """
     query = {f"translations.{translation}": {"$exists": True}}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return country_collection.find(query, projection)
 
 
-async def filter_by_demonym(name: str, fields: Optional[str]):
+def filter_by_demonym(name: str, projection: Mapping[str, int], prefix: bool = False):
     """
     Find countries by demonym (name for citizens/inhabitants).
 
     Args:
         name: Demonym name pattern to search for
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
+        prefix: Whether the demonym must start with the pattern (True) or may contain it anywhere (False)
 
     Returns:
-        List of countries matching the demonym pattern
+        Cursor over countries matching the demonym pattern
     """
-    query = {"demonym": {"$regex": name, "$options": "i"}}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    query = {"demonym_lower": _build_regex(name, prefix)}
+    return country_collection.find(query, projection)
 
 
-async def filter_by_area(
+def filter_by_area(
     min: Optional[float],
     max: Optional[float],
     region: Optional[str],
-    fields: Optional[str],
+    projection: Mapping[str, int],
 ):
     """
     Find countries by area range and optionally filtered by region.
@@ -304,10 +411,10 @@ async def filter_by_area(
         min: Minimum area in square kilometers (inclusive)
         max: Maximum area in square kilometers (inclusive)
         region: Optional region name to filter by
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
-        List of countries matching the area criteria
+        Cursor over countries matching the area criteria
     """
     query: Dict[str, Any] = {}
     area_q: Dict[str, Any] = {}
@@ -319,35 +426,31 @@ async def filter_by_area(
         query["areaKm2"] = area_q
     if region:
         query["region"] = region
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return country_collection.find(query, projection)
 
 
-async def sort_by_density(sort: str, fields: Optional[str]):
+def sort_by_density(sort: str, projection: Mapping[str, int]):
     """
     Get countries sorted by population density (population / area).
 
     Args:
         sort: Sort direction, "asc" for ascending or "desc" for descending
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
-        List of countries sorted by population density
+        Cursor over countries sorted by population density
     """
-    # compute density on the fly: population / areaKm2
-    projection = _build_projection(fields) or {"population": 1, "areaKm2": 1}
-    all_docs = await country_collection.find({}, projection).to_list(None)
-    all_docs = [convert_mongo_doc(d) for d in all_docs if d.get("areaKm2")]
-    all_docs.sort(key=lambda d: d["population"]/d["areaKm2"], reverse=(sort == "desc"))
-    return all_docs
+    # densityPerKm2 is precomputed by ensure_derived_fields and indexed; it is
+    # null for countries without a known area
+    cursor = country_collection.find({"densityPerKm2": {"$ne": None}}, projection)
+    return cursor.sort("densityPerKm2", DESCENDING if sort == "desc" else ASCENDING)
 
 
-async def filter_by_population(
+def filter_by_population(
     min: Optional[int],
     max: Optional[int],
     region: Optional[str],
-    fields: Optional[str],
+    projection: Mapping[str, int],
 ):
     """
     Find countries by population range and optionally filtered by region.
@@ -356,10 +459,10 @@ async def filter_by_population(
         min: Minimum population (inclusive)
         max: Maximum population (inclusive)
         region: Optional region name to filter by
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
-        List of countries matching the population criteria
+        Cursor over countries matching the population criteria
     """
     query: Dict[str, Any] = {}
     pop_q: Dict[str, Any] = {}
@@ -371,46 +474,92 @@ async def filter_by_population(
         query["population"] = pop_q
     if region:
         query["region"] = region
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    return country_collection.find(query, projection)
 
 
-async def random_countries(count: int, fields: Optional[str]):
+async def random_countries(count: int, projection: Mapping[str, int]):
     """
     Get a random selection of countries.
 
     Args:
         count: Number of random countries to return
-        fields: Comma-separated list of fields to include in the result
+        projection: MongoDB projection built from the requested fields
 
     Returns:
         List of randomly selected countries
     """
-    total = await country_collection.count_documents({})
-    count = min(count, total)
-    indices = random.sample(range(total), count)
-    cursor = country_collection.find({}, _build_projection(fields))
-    all_docs = await cursor.to_list(None)
-    all_docs = [convert_mongo_doc(doc) for doc in all_docs]
-    return [all_docs[i] for i in indices]
+    pipeline = [
+        {"$sample": {"size": count}},
+        {"$project": projection},
+    ]
+    return await _collect(country_collection.aggregate(pipeline), count)
 
 
-async def compare_countries(codes: List[str], fields: Optional[str]):
+def compare_countries(codes: Sequence[str], projection: Mapping[str, int]):
     """
     Compare multiple countries by their alpha-3 codes.
 
     Args:
-        codes: List of alpha-3 country codes to compare
-        fields: Comma-separated list of fields to include in the result
+        codes: Upper-case alpha-3 country codes to compare
+        projection: MongoDB projection built from the requested fields
 
     Returns:
-        List of countries matching the provided codes
+        Cursor over countries matching the provided codes, in the order the codes were given
+    """
+    codes = list(codes)
+    projection = dict(projection)
+    if not any(projection.values()):
+        # exclusion projection: also hide the helper sort key
+        projection["order"] = 0
+    return _aggregate_paged(
+        match={"alpha3Code": {"$in": codes}},
+        sort={"order": ASCENDING},
+        sort_keys={"order": {"$indexOfArray": [codes, "$alpha3Code"]}},
+        project=projection,
+    )
+
+
+# Case-insensitive comparison (strength 2 ignores case but not diacritics)
+_CASE_INSENSITIVE = Collation(locale="en", strength=CollationStrength.SECONDARY)
+
+
+# Metadata helpers only need the set of keys, never an order: do not add a sort to
+# _distinct. A future caller that needs one must sort on an index (pass a hint).
+async def _distinct(field: str) -> List[Any]:
     """
-    query = {"alpha3Code": {"$in": [c.upper() for c in codes]}}
-    projection = _build_projection(fields)
-    results = await country_collection.find(query, projection).to_list(1000)
-    return [convert_mongo_doc(doc) for doc in results]
+    Get the distinct values of a field across all countries.
+
+    Values that differ only in case are merged by the server.
+
+    Args:
+        field: Dotted path of the field to collect values from
+
+    Returns:
+        List of distinct values, in no particular order
+    """
+    return await country_collection.distinct(field, collation=_CASE_INSENSITIVE)
+
+
+# Metadata lists by field, served from memory; filled by refresh_meta at startup
+_META_FIELDS = ("region", "subregion", "languages.iso639_1", "currencies.code")
+_meta: Dict[str, List[Any]] = {}
+
+
+async def refresh_meta() -> None:
+    """
+    Recompute the metadata lists served by the /meta endpoints.
+
+    They only change when country data is imported, so this runs at startup and
+    when an import asks for it, instead of on every request.
+    """
+    values = await asyncio.gather(*(_distinct(field) for field in _META_FIELDS))
+    _meta.update(zip(_META_FIELDS, values))
+
+
+async def _get_meta(field: str) -> List[Any]:
+    if field not in _meta:
+        await refresh_meta()
+    return _meta[field]
 
 
 async def get_meta_regions() -> List[str]:
@@ -420,7 +569,7 @@ async def get_meta_regions() -> List[str]:
     Returns:
         List of region names
     """
-    return await country_collection.distinct("region")
+    return await _get_meta("region")
 
 
 async def get_meta_subregions() -> List[str]:
@@ -430,20 +579,17 @@ async def get_meta_subregions() -> List[str]:
     Returns:
         List of subregion names
     """
-    return await country_collection.distinct("subregion")
+    return await _get_meta("subregion")
 
 
 async def get_meta_languages() -> List[str]:
-    # return list of unique iso639_1 codes used
-    async def get_meta_languages() -> List[str]:
-        """
-        Get a list of all unique language codes used in the database.
+    """
+    Get a list of all unique language codes used in the database.
 
-        Returns:
-            List of ISO639-1 language codes
-        """
-    # return list of unique iso639_1 codes used
-    return await country_collection.distinct("languages.iso639_1")
+    Returns:
+        List of ISO639-1 language codes
+    """
+    return await _get_meta("languages.iso639_1")
 
 
 async def get_meta_currencies() -> List[str]:
@@ -453,6 +599,4 @@ async def get_meta_currencies() -> List[str]:
     Returns:
         List of currency codes
     """
-    return await country_collection.distinct("currencies.code")
-
-
+    return await _get_meta("currencies.code")
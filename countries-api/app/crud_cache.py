@@ -0,0 +1,107 @@
+import asyncio
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Mapping
+
+from cachetools import TTLCache
+from cachetools.keys import hashkey
+
+# Calls currently running, keyed by function and arguments
+_inflight: Dict[Hashable, asyncio.Future] = {}
+# Every cache created by `cached`, so they can be dropped together when the data changes
+_caches: List[TTLCache] = []
+
+
+def _freeze(value: Any) -> Any:
+    # projections arrive as read-only mappings, which are not hashable themselves
+    if isinstance(value, Mapping):
+        return tuple(value.items())
+    return value
+
+
+def _make_key(*args, **kwargs) -> Hashable:
+    return hashkey(*map(_freeze, args), **{k: _freeze(v) for k, v in kwargs.items()})
+
+
+def cached(ttl: int = 3600, maxsize: int = 1024):
+    """
+    Cache the results of an async CRUD function in-process for `ttl` seconds.
+
+    Entries are keyed by the call arguments. Concurrent misses for the same key
+    wait on a shared lock so only one of them queries MongoDB.
+
+    Args:
+        ttl: Number of seconds a result stays cached
+        maxsize: Maximum number of argument combinations kept per function
+
+    Returns:
+        Decorator for an async function; the wrapper exposes the cache as `.cache`
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        _caches.append(cache)
+        locks: Dict[Hashable, asyncio.Lock] = {}
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = _make_key(*args, **kwargs)
+            try:
+                return cache[key]
+            except KeyError:
+                pass
+
+            lock = locks.get(key)
+            created = lock is None
+            if created:
+                lock = locks[key] = asyncio.Lock()
+            try:
+                async with lock:
+                    # another request may have filled the entry while we waited
+                    try:
+                        return cache[key]
+                    except KeyError:
+                        pass
+                    result = await func(*args, **kwargs)
+                    cache[key] = result
+                    return result
+            finally:
+                # only the creator removes the lock; a waiter could otherwise drop a newer one
+                if created:
+                    locks.pop(key, None)
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def clear_caches() -> None:
+    """Drop every cached CRUD result, e.g. after the country data was updated."""
+    for cache in _caches:
+        cache.clear()
+
+
+def single_flight(func: Callable[..., Awaitable[Any]]):
+    """
+    Coalesce concurrent calls of an async CRUD function that share the same arguments.
+
+    The first caller starts the query; callers arriving while it is still running
+    await the same future instead of issuing an identical MongoDB query.
+
+    Args:
+        func: Async function whose arguments are hashable or mappings
+
+    Returns:
+        Wrapped async function
+    """
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        key = (func.__qualname__, _make_key(*args, **kwargs))
+        future = _inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(func(*args, **kwargs))
+            _inflight[key] = future
+            future.add_done_callback(lambda _: _inflight.pop(key, None))
+        # shield so one cancelled request does not cancel the query for the others
+        return await asyncio.shield(future)
+
+    return wrapper
@@ -1,45 +1,134 @@
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING
+import asyncio
 import os
+from typing import Any, Dict
 from bson import ObjectId
-from typing import Dict, Any, List
+from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
 
 # MONGO_DETAILS = "mongodb://localhost:27017"
 
-client = AsyncIOMotorClient(os.getenv("MONGODB_URI"))
-database = client.countries_db
-country_collection = database.get_collection("countries")
 
+class ObjectIdAsStr(TypeDecoder):
+    """
+    Decode ObjectId values straight to strings so documents come out of the driver JSON serializable.
 
-# Add function to handle MongoDB document serialization
-def convert_mongo_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    This runs inside the BSON decoder, replacing a recursive post-processing pass over every document.
     """
-    Convert MongoDB document to JSON serializable dictionary. This function converts ObjectId fields to strings and recursively processes nested dictionaries and lists to ensure they are JSON serializable.
+    bson_type = ObjectId
+
+    def transform_bson(self, value: ObjectId) -> str:
+        return str(value)
 
-    Args:
-        doc (Dict[str, Any]): The MongoDB document to convert.
 
-    Returns:
-        Dict[str, Any]: The converted document with ObjectId fields as strings.
+# One client (and connection pool) shared by the whole process. minPoolSize keeps
+# warm connections around so requests after startup skip the TCP/TLS handshake.
+client = AsyncIOMotorClient(
+    os.getenv("MONGODB_URI"),
+    maxPoolSize=50,
+    minPoolSize=10,
+    serverSelectionTimeoutMS=2000,
+    # Compress the wire protocol; the server picks the first one it also supports.
+    # zstd needs the zstandard package, zlib is the stdlib fallback.
+    compressors="zstd,zlib",
+    zlibCompressionLevel=-1,
+)
+database = client.countries_db
+country_collection = database.get_collection(
+    "countries",
+    codec_options=CodecOptions(type_registry=TypeRegistry([ObjectIdAsStr()])),
+)
+
 
-    If the input document is None, it returns None.
+def _lower_strings(value: Any) -> Dict[str, Any]:
     """
-    if doc is None:
-        return None
+    Build an aggregation expression lower-casing `value` if it is a string, or the strings in it if it is an array.
 
-    # Convert ObjectId to string
-    if '_id' in doc and isinstance(doc['_id'], ObjectId):
-        doc['_id'] = str(doc['_id'])
+    Anything else (a missing field, an object) becomes null, as $toLower rejects objects and arrays.
+    """
+    return {"$let": {"vars": {"value": value}, "in": {"$switch": {
+        "branches": [
+            {"case": {"$eq": [{"$type": "$$value"}, "string"]}, "then": {"$toLower": "$$value"}},
+            {"case": {"$isArray": "$$value"}, "then": {"$map": {
+                "input": {"$filter": {"input": "$$value", "cond": {"$eq": [{"$type": "$$this"}, "string"]}}},
+                "in": {"$toLower": "$$this"},
+            }}},
+        ],
+        "default": None,
+    }}}}
 
-    # Recursively process nested dictionaries and arrays
-    for key, value in doc.items():
-        # Convert ObjectId in nested dictionaries
-        if isinstance(value, dict):
-            doc[key] = convert_mongo_doc(value)
-        # Convert ObjectId in lists of dictionaries
-        elif isinstance(value, list) and value and isinstance(value[0], dict):
-            doc[key] = [convert_mongo_doc(item) for item in value]
 
-    return doc
+async def ensure_derived_fields() -> None:
+    """
+    Store the lookup fields that crud.py derives from other fields of each country.
 
+    The import script does not write these, so they are backfilled here. Only documents
+    missing a field are updated: cheap once the collection is prepared. Newly imported
+    documents are picked up on the next startup or by POST /v1/admin/refresh-meta.
+    """
+    # Every code a country can be looked up by, so /alpha needs one index probe
+    await country_collection.update_many(
+        {"codes": {"$exists": False}},
+        [{"$set": {"codes": {"$filter": {
+            "input": ["$alpha2Code", "$alpha3Code", "$numericCode", "$cioc"],
+            "cond": {"$ne": ["$$this", None]},
+        }}}}],
+    )
+    # Lower-cased copies of the searchable names, so lookups need no case-insensitive regex.
+    # $toLower only folds ASCII letters; crud.py lowers user input the same way.
+    await country_collection.update_many(
+        {"name_lower": {"$exists": False}},
+        [{"$set": {
+            # REST Countries v3 imports store the name as an object and the capital as a list
+            "name_lower": _lower_strings({"$ifNull": ["$name.common", "$name"]}),
+            "capital_lower": _lower_strings("$capital"),
+            "demonym_lower": _lower_strings("$demonym"),
+        }}],
+    )
+    # Population density, so /density sorts on an index instead of computing it per request
+    await country_collection.update_many(
+        {"densityPerKm2": {"$exists": False}},
+        [{"$set": {"densityPerKm2": {"$cond": [
+            {"$gt": ["$areaKm2", 0]},
+            {"$divide": ["$population", "$areaKm2"]},
+            None,
+        ]}}}],
+    )
 
 
+async def ensure_indexes() -> None:
+    """
+    Create the indexes used by the query helpers in crud.py.
+
+    create_index is idempotent, so this is safe to run on every application startup.
+    """
+    await asyncio.gather(
+        # Exact lookups and prefix-anchored regex searches (an index range scan)
+        country_collection.create_index("name"),
+        country_collection.create_index("nativeName"),
+        country_collection.create_index("name_lower"),
+        country_collection.create_index("capital_lower"),
+        country_collection.create_index("demonym_lower"),
+        # Full-text search over every name a country is known by
+        country_collection.create_index(
+            [("name", "text"), ("nativeName", "text"), ("altSpellings", "text")],
+            name="country_text",
+        ),
+        # Code lookups
+        country_collection.create_index("codes"),
+        # Sparse, as not every import has these fields; the enrichment script writes by cca3
+        country_collection.create_index("alpha3Code", unique=True, sparse=True),
+        country_collection.create_index("cca3", unique=True, sparse=True),
+        # Equality filters
+        country_collection.create_index("subregion"),
+        country_collection.create_index("borders"),
+        country_collection.create_index("landlocked"),
+        country_collection.create_index("currencies.code"),
+        country_collection.create_index("languages.iso639_1"),
+        # Range filters; the region-prefixed compounds also serve region-only queries
+        country_collection.create_index("population"),
+        country_collection.create_index("areaKm2"),
+        country_collection.create_index("densityPerKm2"),
+        country_collection.create_index([("region", ASCENDING), ("areaKm2", ASCENDING)]),
+        country_collection.create_index([("region", ASCENDING), ("population", ASCENDING)]),
+    )
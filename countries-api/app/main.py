@@ -63,6 +63,7 @@
 # /v1/meta/subregions               # Get all subregions
 # /v1/meta/languages               # Get all languages
 # /v1/meta/currencies               # Get all currencies
+# /v1/admin/refresh-meta (POST)     # Backfill derived fields, recompute the meta lists and drop cached responses after a data import (X-Admin-Token)
 #
 # # Optional Query Parameters (All Endpoints)
 # fields                          # Select specific fields | Comma-separated list of fields to include in the response (e.g. ?fields=name.common,population,areaKm2). Use the `fields` query parameter to specify which fields you want to include in the response. If not provided, all fields will be included.
@@ -71,11 +72,51 @@
 # independent                   # Filter by independent status | Filter the results by independent status (e.g. ?independent=false). Use the `independent` query parameter to filterthe results by independent status. If not provided, all countries will be included.
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
+from app import response_cache
+from app.crud import refresh_meta
+from app.database import client, ensure_derived_fields, ensure_indexes
 from app.routes.countries import router as countries_router
 
 app = FastAPI(
     title="Countries API",
     description="An API for country data",
     version="0.1.0",
+    default_response_class=ORJSONResponse,
 )
 app.include_router(countries_router)
+
+
+@app.on_event("startup")
+async def warm_up_connection():
+    """Open the MongoDB connection pool before the first request arrives."""
+    await client.admin.command("ping")
+
+
+@app.on_event("startup")
+async def add_derived_fields():
+    """Backfill the lookup fields computed from other country fields."""
+    await ensure_derived_fields()
+
+
+@app.on_event("startup")
+async def create_indexes():
+    """Make sure the MongoDB indexes backing the query endpoints exist."""
+    await ensure_indexes()
+
+
+@app.on_event("startup")
+async def prime_meta():
+    """Load the metadata lists once, so the /meta endpoints are served from memory."""
+    await refresh_meta()
+
+
+@app.on_event("startup")
+async def connect_response_cache():
+    """Connect the shared Redis response cache, when one is configured."""
+    await response_cache.connect()
+
+
+@app.on_event("shutdown")
+async def close_response_cache():
+    await response_cache.close()
@@ -0,0 +1,168 @@
+import asyncio
+import inspect
+import logging
+import os
+from functools import wraps
+from typing import Any, Awaitable, Callable, Optional
+
+import orjson
+from fastapi import Request, Response
+from pymongo.errors import PyMongoError
+
+from app.crud import refresh_meta
+from app.crud_cache import clear_caches
+
+# Redis is optional: without REDIS_URL, responses are only cached in-process by crud_cache
+REDIS_URL = os.getenv("REDIS_URL")
+VERSION_KEY = "countries:cache-version"
+INVALIDATE_CHANNEL = "countries:invalidate"
+# Seconds to wait before resubscribing after the invalidation channel dropped
+RECONNECT_DELAY = 5
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+_redis_errors: tuple = ()
+_listener: Optional[asyncio.Task] = None
+# Part of every key; bumped when the data changes, so stale entries are never read again
+_version = 0
+
+
+async def connect() -> None:
+    """
+    Connect to Redis and start listening for invalidations, if REDIS_URL is set.
+    """
+    global _redis, _redis_errors, _listener, _version
+    if not REDIS_URL:
+        return
+
+    from redis import asyncio as aioredis
+    from redis.exceptions import RedisError
+
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        _version = int(await redis.get(VERSION_KEY) or 0)
+    except RedisError as e:
+        # the cache is optional: serve requests uncached rather than fail to start
+        logger.warning("Redis is unavailable, responses will not be cached: %s", e)
+        await redis.aclose()
+        return
+
+    _redis = redis
+    _redis_errors = (RedisError,)
+    _listener = asyncio.create_task(_listen_for_invalidations())
+
+
+async def close() -> None:
+    """Stop the invalidation listener and close the Redis connection."""
+    global _redis
+    if _listener is not None:
+        _listener.cancel()
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def _refresh_local_data() -> None:
+    """Drop this process's cached query results and reload its metadata lists."""
+    clear_caches()
+    try:
+        await refresh_meta()
+    except PyMongoError as e:
+        logger.warning("Could not refresh the metadata lists: %s", e)
+
+
+async def _listen_for_invalidations() -> None:
+    global _version
+    reconnecting = False
+    while True:
+        try:
+            async with _redis.pubsub() as pubsub:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                if reconnecting:
+                    # invalidations published while disconnected were missed
+                    _version = int(await _redis.get(VERSION_KEY) or 0)
+                    await _refresh_local_data()
+                    logger.info("Resubscribed to Redis cache invalidations")
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        _version = int(message["data"])
+                        await _refresh_local_data()
+        except _redis_errors as e:
+            logger.warning("Lost Redis cache invalidations, retrying in %ss: %s", RECONNECT_DELAY, e)
+        reconnecting = True
+        await asyncio.sleep(RECONNECT_DELAY)
+
+
+async def publish_invalidation() -> None:
+    """
+    Tell every API process that the country data changed.
+
+    Bumps the shared cache version, so existing Redis entries are no longer read,
+    and publishes it so the processes also drop their in-process caches and reload
+    their metadata lists.
+    """
+    if not REDIS_URL:
+        return
+
+    from redis import asyncio as aioredis
+
+    redis = aioredis.from_url(REDIS_URL)
+    try:
+        version = await redis.incr(VERSION_KEY)
+        await redis.publish(INVALIDATE_CHANNEL, version)
+    finally:
+        await redis.aclose()
+
+
+def _cache_key(request: Request) -> str:
+    query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    return f"countries:{_version}:{request.url.path}?{query}"
+
+
+def cache_response(ttl: int = 3600):
+    """
+    Cache the JSON body of a route handler in Redis for `ttl` seconds.
+
+    Entries are keyed by the request path and its sorted query parameters. When Redis
+    is not configured or unavailable, the handler is simply called.
+
+    Args:
+        ttl: Number of seconds a response stays cached
+
+    Returns:
+        Decorator for an async route handler, applied below the `@router.get` decorator
+    """
+    def decorator(handler: Callable[..., Awaitable[Any]]):
+        @wraps(handler)
+        async def wrapper(*args, request: Request, **kwargs):
+            if _redis is None:
+                return await handler(*args, **kwargs)
+
+            key = _cache_key(request)
+            try:
+                body = await _redis.get(key)
+            except _redis_errors:
+                body = None
+            if body is not None:
+                return Response(body, media_type="application/json")
+
+            result = await handler(*args, **kwargs)
+            if isinstance(result, Response):
+                # e.g. a streamed response; only JSON-serializable results are cached
+                return result
+
+            body = orjson.dumps(result)
+            try:
+                await _redis.set(key, body, ex=ttl)
+            except _redis_errors:
+                pass
+            return Response(body, media_type="application/json")
+
+        # let FastAPI inject the request alongside the handler's own parameters
+        signature = inspect.signature(handler)
+        request_param = inspect.Parameter("request", inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+        wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), request_param])
+        return wrapper
+
+    return decorator
@@ -1,26 +1,80 @@
-from typing import Optional
-
-from fastapi import APIRouter, HTTPException, Query
-from app.crud import (get_all_countries, get_country_by_code, search_countries,
-                      filter_by_border, filter_landlocked, filter_by_currency,
+import os
+import secrets
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+import orjson
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from app.crud import (build_projection, find_all_countries, get_all_countries, get_country_by_code,
+                      search_countries, filter_by_border, filter_landlocked, filter_by_currency,
                       filter_by_capital, filter_by_region, filter_by_subregion,
                       filter_by_language, filter_by_translation, filter_by_demonym,
                       filter_by_area, sort_by_density, filter_by_population,
                       random_countries, compare_countries, get_meta_regions,
-                      get_meta_subregions, get_meta_languages, get_meta_currencies)
+                      get_meta_subregions, get_meta_languages, get_meta_currencies,
+                      refresh_meta)
+from app.crud_cache import clear_caches
+from app.database import ensure_derived_fields
+from app.response_cache import cache_response, publish_invalidation
 
 router = APIRouter(prefix="/v1", tags=["countries"])
 
+# The admin endpoints are disabled unless a token is configured
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+async def _json_array(first: Dict[str, Any], cursor) -> AsyncIterator[bytes]:
+    """Encode an already fetched first document and the rest of its cursor as a JSON array, one document at a time."""
+    yield b"[" + orjson.dumps(first)
+    async for doc in cursor:
+        yield b"," + orjson.dumps(doc)
+    yield b"]"
+
+
+async def _stream_json(cursor) -> Response:
+    """
+    Stream a cursor to the client as it is read instead of buffering the whole result.
+
+    The first document is fetched before the response starts, so errors of the query
+    itself (bad projection, missing index, timeout) still become an error status
+    instead of a truncated 200 body.
+    """
+    try:
+        first = await cursor.next()
+    except StopAsyncIteration:
+        return Response(b"[]", media_type="application/json")
+    return StreamingResponse(_json_array(first, cursor), media_type="application/json")
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)) -> None:
+    """Reject admin requests that do not carry the configured X-Admin-Token header."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+def fields_dep(fields: Optional[str] = None) -> Mapping[str, int]:
+    """Parse the `fields` query parameter once per request into a MongoDB projection."""
+    return build_projection(fields)
+
+
+def density_fields_dep(fields: Optional[str] = None) -> Mapping[str, int]:
+    """Like `fields_dep`, but defaults to the fields population density is derived from."""
+    return build_projection(fields or "population,areaKm2,densityPerKm2")
+
 
 # Core Country Endpoints
 @router.get("/all")
+@cache_response(ttl=3600)
 async def all_countries(
-    fields: Optional[str] = None,
+    projection: Mapping[str, int] = Depends(fields_dep),
     sort: Optional[str] = None,
     unMember: Optional[bool] = None,
     independent: Optional[bool] = None,
     limit: int = Query(100, ge=1, le=1000),
     skip: int = Query(0, ge=0),
+    stream: bool = True,
 ):
     """
     Retrieve a list of all countries with optional filtering and sorting.
@@ -32,15 +86,19 @@ async def all_countries(
         independent: Filter by independence status (true/false)
         limit: Maximum number of results to return (1-1000, default: 100)
         skip: Number of results to skip for pagination (default: 0)
+        stream: Stream the results as they are read (default), or build and cache the whole list (false)
 
     **Returns:**
         List of country objects matching the criteria
     """
-    return await get_all_countries(fields, sort, unMember, independent, limit, skip)
+    if stream:
+        return await _stream_json(find_all_countries(projection, sort, unMember, independent, limit, skip))
+    return await get_all_countries(projection, sort, unMember, independent, limit, skip)
 
 
 @router.get("/id/{id}")
-async def country_by_id(id: str, fields: Optional[str] = None):
+@cache_response(ttl=3600)
+async def country_by_id(id: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Retrieve a specific country by its unique ID.
 
@@ -51,14 +109,15 @@ async def country_by_id(id: str, fields: Optional[str] = None):
     Returns:
         Country object or 404 if not found
     """
-    country = await get_country_by_code(id, fields)
+    country = await get_country_by_code(id, projection)
     if not country:
         raise HTTPException(404, "Country not found")
     return country
 
 
 @router.get("/alpha/{code}")
-async def country_by_code(code: str, fields: Optional[str] = None):
+@cache_response(ttl=3600)
+async def country_by_code(code: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Retrieve a specific country by its alpha code (2 or 3 letters).
 
@@ -69,7 +128,7 @@ async def country_by_code(code: str, fields: Optional[str] = None):
     Returns:
         Country object or 404 if not found
     """
-    country = await get_country_by_code(code, fields)
+    country = await get_country_by_code(code, projection)
     if not country:
         raise HTTPException(404, "Country not found")
     return country
@@ -79,23 +138,23 @@ async def country_by_code(code: str, fields: Optional[str] = None):
 @router.get("/search")
 async def countries_search(
     q: str = Query(..., description="Partial or full country name"),
-    fields: Optional[str] = None
+    projection: Mapping[str, int] = Depends(fields_dep)
 ):
     """
     Search countries by name.
 
     Parameters:
-        q: Partial or full country name to search for
+        q: One or more words of the country name to search for
         fields: Comma-separated list of fields to include in the response
 
     Returns:
-        List of countries matching the search query
+        List of countries matching the search query, most relevant first
     """
-    return await search_countries(q, fields)
+    return await _stream_json(search_countries(q, projection))
 
 
 @router.get("/name/{countryName}")
-async def country_by_name(countryName: str, fields: Optional[str] = None):
+async def country_by_name(countryName: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Find a country by its exact name.
 
@@ -106,27 +165,29 @@ async def country_by_name(countryName: str, fields: Optional[str] = None):
     Returns:
         Country object matching the name or empty array if not found
     """
-    return await search_countries(countryName, fields, exact=True)
+    return await _stream_json(search_countries(countryName, projection, exact=True))
 
 
 @router.get("/capital/{capital}")
-async def countries_by_capital(capital: str, fields: Optional[str] = None):
+async def countries_by_capital(capital: str, projection: Mapping[str, int] = Depends(fields_dep), prefix: bool = False):
     """
     Find countries by their capital city.
 
     Parameters:
         capital: Name of the capital city
         fields: Comma-separated list of fields to include in the response
+        prefix: Only match capitals starting with the name (faster, uses the index) instead of containing it anywhere
 
     Returns:
         List of countries with the matching capital
     """
-    return await filter_by_capital(capital, fields)
+    return await _stream_json(filter_by_capital(capital, projection, prefix))
 
 
 # Geographical Endpoints
 @router.get("/region/{region}")
-async def countries_by_region(region: str, fields: Optional[str] = None):
+@cache_response(ttl=3600)
+async def countries_by_region(region: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Filter countries by geographical region.
 
@@ -137,11 +198,12 @@ async def countries_by_region(region: str, fields: Optional[str] = None):
     Returns:
         List of countries in the specified region
     """
-    return await filter_by_region(region, fields)
+    return await filter_by_region(region, projection)
 
 
 @router.get("/subregion/{subregion}")
-async def countries_by_subregion(subregion: str, fields: Optional[str] = None):
+@cache_response(ttl=3600)
+async def countries_by_subregion(subregion: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Filter countries by geographical subregion.
 
@@ -152,11 +214,11 @@ async def countries_by_subregion(subregion: str, fields: Optional[str] = None):
     Returns:
         List of countries in the specified subregion
     """
-    return await filter_by_subregion(subregion, fields)
+    return await filter_by_subregion(subregion, projection)
 
 
 @router.get("/bordering/{code}")
-async def countries_bordering(code: str, fields: Optional[str] = None):
+async def countries_bordering(code: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Get all countries that share a border with the specified country.
 
@@ -167,11 +229,12 @@ async def countries_bordering(code: str, fields: Optional[str] = None):
     Returns:
         List of countries bordering the specified country
     """
-    return await filter_by_border(code, fields)
+    return await _stream_json(filter_by_border(code, projection))
 
 
 @router.get("/landlocked")
-async def landlocked_countries(fields: Optional[str] = None):
+@cache_response(ttl=3600)
+async def landlocked_countries(projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Get all landlocked countries.
 
@@ -181,12 +244,13 @@ async def landlocked_countries(fields: Optional[str] = None):
     Returns:
         List of landlocked countries
     """
-    return await filter_landlocked(fields)
+    return await filter_landlocked(projection)
 
 
 # Cultural/Linguistic Endpoints
 @router.get("/currency/{currency}")
-async def countries_by_currency(currency: str, fields: Optional[str] = None):
+@cache_response(ttl=3600)
+async def countries_by_currency(currency: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Find countries that use a specific currency.
 
@@ -197,11 +261,12 @@ async def countries_by_currency(currency: str, fields: Optional[str] = None):
     Returns:
         List of countries using the specified currency
     """
-    return await filter_by_currency(currency, fields)
+    return await filter_by_currency(currency, projection)
 
 
 @router.get("/lang/{language}")
-async def countries_by_language(language: str, fields: Optional[str] = None):
+@cache_response(ttl=3600)
+async def countries_by_language(language: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Find countries that use a specific language.
 
@@ -212,11 +277,11 @@ async def countries_by_language(language: str, fields: Optional[str] = None):
     Returns:
         List of countries using the specified language
     """
-    return await filter_by_language(language, fields)
+    return await filter_by_language(language, projection)
 
 
 @router.get("/translation/{translation}")
-async def countries_by_translation(translation: str, fields: Optional[str] = None):
+async def countries_by_translation(translation: str, projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Find countries that have a translation in a specific language.
 
@@ -227,22 +292,23 @@ async def countries_by_translation(translation: str, fields: Optional[str] = Non
     Returns:
         List of countries with translations in the specified language
     """
-    return await filter_by_translation(translation, fields)
+    return await _stream_json(filter_by_translation(translation, projection))
 
 
 @router.get("/demonym/{name}")
-async def countries_by_demonym(name: str, fields: Optional[str] = None):
+async def countries_by_demonym(name: str, projection: Mapping[str, int] = Depends(fields_dep), prefix: bool = False):
     """
     Find countries by their demonym (name for citizens/inhabitants).
 
     Parameters:
         name: Demonym name pattern to search for
         fields: Comma-separated list of fields to include in the response
+        prefix: Only match demonyms starting with the name (faster, uses the index) instead of containing it anywhere
 
     Returns:
         List of countries with matching demonym
     """
-    return await filter_by_demonym(name, fields)
+    return await _stream_json(filter_by_demonym(name, projection, prefix))
 
 
 # Statistical Endpoints
@@ -251,7 +317,7 @@ async def countries_by_area(
     min: Optional[float] = Query(None, ge=0),
     max: Optional[float] = Query(None, ge=0),
     region: Optional[str] = None,
-    fields: Optional[str] = None,
+    projection: Mapping[str, int] = Depends(fields_dep),
 ):
     """
     Filter countries by area range.
@@ -265,13 +331,13 @@ async def countries_by_area(
     Returns:
         List of countries within the specified area range
     """
-    return await filter_by_area(min, max, region, fields)
+    return await _stream_json(filter_by_area(min, max, region, projection))
 
 
 @router.get("/density")
 async def countries_density(
     sort: Optional[str] = Query("asc", regex="^(asc|desc)$"),
-    fields: Optional[str] = None
+    projection: Mapping[str, int] = Depends(density_fields_dep),
 ):
     """
     Get countries sorted by population density.
@@ -283,7 +349,7 @@ async def countries_density(
     Returns:
         List of countries sorted by population density
     """
-    return await sort_by_density(sort, fields)
+    return await _stream_json(sort_by_density(sort, projection))
 
 
 @router.get("/population")
@@ -291,7 +357,7 @@ async def countries_by_population(
     min: Optional[int] = Query(None, ge=0),
     max: Optional[int] = Query(None, ge=0),
     region: Optional[str] = None,
-    fields: Optional[str] = None
+    projection: Mapping[str, int] = Depends(fields_dep)
 ):
     """
     Filter countries by population range.
@@ -305,12 +371,12 @@ async def countries_by_population(
     Returns:
         List of countries within the specified population range
     """
-    return await filter_by_population(min, max, region, fields)
+    return await _stream_json(filter_by_population(min, max, region, projection))
 
 
 # Special Feature Endpoints
 @router.get("/countries/random")
-async def random_country(count: int = Query(1, ge=1, le=100), fields: Optional[str] = None):
+async def random_country(count: int = Query(1, ge=1, le=100), projection: Mapping[str, int] = Depends(fields_dep)):
     """
     Get random countries.
 
@@ -321,10 +387,13 @@ async def random_country(count: int = Query(1, ge=1, le=100), fields: Optional[s
     Returns:
         List of random country objects
     """
-    return await random_countries(count, fields)
+    return await random_countries(count, projection)
 
 @router.get("/compare")
-async def compare(codes: str = Query(..., description="Comma-separated codes"), fields: Optional[str] = None):
+async def compare(
+    codes: str = Query(..., max_length=512, description="Comma-separated codes"),
+    projection: Mapping[str, int] = Depends(fields_dep),
+):
     """
     Compare multiple countries.
 
@@ -333,10 +402,13 @@ async def compare(codes: str = Query(..., description="Comma-separated codes"),
         fields: Comma-separated list of fields to include in the response
 
     Returns:
-        List of country objects for comparison
+        List of country objects for comparison, or 400 if no codes were given
     """
-    code_list = codes.split(",")
-    return await compare_countries(code_list, fields)
+    # normalize once; drop empty entries (e.g. "IND,,USA,") and duplicates, keeping their order
+    code_list = tuple(dict.fromkeys(c.strip().upper() for c in codes.split(",") if c.strip()))
+    if not code_list:
+        raise HTTPException(400, "No country codes given")
+    return await _stream_json(compare_countries(code_list, projection))
 
 
 # Metadata Endpoints
@@ -384,6 +456,26 @@ async def meta_currencies():
     return await get_meta_currencies()
 
 
+# Admin Endpoints
+@router.post("/admin/refresh-meta", status_code=204, include_in_schema=False,
+             dependencies=[Depends(require_admin_token)])
+async def admin_refresh_meta():
+    """
+    Backfill the derived lookup fields, recompute the metadata lists and drop the
+    cached responses, e.g. after importing country data.
+
+    Requires the X-Admin-Token header to match the ADMIN_TOKEN environment variable.
+    Other API processes and the Redis response cache are invalidated through Redis.
+
+    Returns:
+        Empty response once the data is up to date
+    """
+    await ensure_derived_fields()
+    await refresh_meta()
+    clear_caches()
+    await publish_invalidation()
+
+
 # # Define the API route for a specific country by code
 # @router.get("/alpha/{code}")
 # async def read_country(code: str):
@@ -1,12 +1,24 @@
 import os
 import asyncio
+import logging
+import logging.handlers
+import queue
+import re
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
+import diskcache
+import orjson
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
 from dotenv import load_dotenv
 from google import genai
-from fastapi.encoders import jsonable_encoder
+from google.genai.errors import APIError
+from tenacity import (before_sleep_log, retry, retry_if_exception, stop_after_attempt,
+                      wait_exponential_jitter)
+
+from app.response_cache import publish_invalidation
 
 # ─── Configuration ─────────────────────────────────────────────────────────────
 
@@ -16,6 +28,7 @@ GEMINI_API_KEY   = os.getenv("GEMINI_API_KEY")
 MONGO_URI        = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DB_NAME          = "countries_db"
 COLLECTION_NAME  = "countries"
+GEMINI_MODEL     = "gemini-1.5-flash"
 
 # ─── Initialize Clients ─────────────────────────────────────────────────────────
 
@@ -27,6 +40,31 @@ collection   = db[COLLECTION_NAME]
 # Gemini
 gemini_client = genai.Client(api_key=GEMINI_API_KEY)
 
+# Answers already received, kept across runs so a re-run does not ask Gemini again
+answer_cache = diskcache.Cache(".enrich_cache")
+
+# ─── Logging ────────────────────────────────────────────────────────────────────
+
+logger = logging.getLogger("enrich")
+
+
+def start_logging() -> logging.handlers.QueueListener:
+    """
+    Send the enrichment log through a queue, so concurrent tasks only enqueue records
+    and a single listener thread writes them to stderr.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
 # ─── Prompt Template ────────────────────────────────────────────────────────────
 
 PROMPT_TEMPLATE = """
@@ -63,18 +101,18 @@ Categories:
 
 # ─── Helper: Parse Gemini’s JSON-like text ───────────────────────────────────────
 
-import json
+# Opening ``` / ```json fence or closing ``` fence, with surrounding whitespace
+_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
 def parse_facts_json(text: str) -> Dict[str, str]:
     """
     Attempts to load Gemini’s response as JSON. Cleans common pitfalls.
     """
-    # Sometimes Gemini wraps JSON in markdown fences or escapes quotes
-    cleaned = text.strip()
-    if cleaned.startswith("```"):
-        # remove code fences
-        cleaned = cleaned.strip("`").strip("json").strip()
+    # Sometimes Gemini wraps JSON in markdown fences; remove only the fences
+    cleaned = _FENCE.sub("", text)
     # now parse
-    return json.loads(cleaned)
+    return orjson.loads(cleaned)
 
 
 # ─── Helper: Convert MongoDB documents to JSON-safe format ──────────────────────
@@ -101,77 +139,186 @@ def normalize_fact_keys(text: str) -> Dict[str, str]:
     return {key_mapping.get(k, k): v for k, v in facts_json.items()}
 
 
-# ─── Main Enrichment Logic ──────────────────────────────────────────────────────
+# ─── Rate Limiting ──────────────────────────────────────────────────────────────
 
-async def enrich_all_countries():
-    cursor = collection.find({}, {"_id": 0, "name.common": 1, "cca3": 1})
-    countries = await cursor.to_list(length=None)
+GEMINI_CONCURRENCY      = 5   # Gemini calls in flight at once
+GEMINI_REQUESTS_PER_MIN = 10  # Sustained request rate allowed by the API quota
+RATE_LIMIT_ATTEMPTS     = 6   # Gemini attempts per country while rate limited (429)
+BULK_WRITE_SIZE         = 50  # Enriched countries written to MongoDB per round trip
 
-    # Track request count to manage rate limiting
-    request_count = 0
 
-    for country in countries:
-        cca3 = country.get("cca3")
-        common_name = country["name"]["common"]
+class TokenBucket:
+    """
+    Async token bucket: allows `rate` requests per `per` seconds, in bursts of up to `rate`.
+    """
 
-        # Add rate limiting: wait after every 10 requests
-        if request_count > 0 and request_count % 10 == 0:
-            print(f"⏱️ Rate limit protection: Pausing for 60 seconds...")
-            time.sleep(60)  # Wait for 60 seconds every 10 requests
+    def __init__(self, rate: int, per: float = 60.0):
+        self.capacity  = rate
+        self.tokens    = float(rate)
+        self.fill_rate = rate / per
+        self.updated   = time.monotonic()
+        self.lock      = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        # waiters queue on the lock, so tokens are handed out in arrival order
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens  = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.fill_rate)
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    return isinstance(error, APIError) and error.code == 429
+
+
+_backoff = wait_exponential_jitter(initial=1, max=60)
+
+
+def wait_for_rate_limit(retry_state) -> float:
+    """Wait as long as the server's Retry-After header asks, else back off exponentially with jitter."""
+    response = getattr(retry_state.outcome.exception(), "response", None)
+    retry_after = (getattr(response, "headers", None) or {}).get("Retry-After")
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return _backoff(retry_state)
+
+
+@retry(
+    retry=retry_if_exception(is_rate_limited),
+    wait=wait_for_rate_limit,
+    stop=stop_after_attempt(RATE_LIMIT_ATTEMPTS),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+    reraise=True,
+)
+async def generate_facts(prompt: str, limiter: TokenBucket) -> str:
+    await limiter.acquire()
+    # Gemini API call through the client's native async API
+    resp = await gemini_client.aio.models.generate_content(
+        model=GEMINI_MODEL,
+        contents=prompt
+    )
+    return resp.text
 
-        print(f"Enriching {common_name} ({cca3})...")
-        prompt = PROMPT_TEMPLATE.format(common_name=common_name)
 
+# ─── Main Enrichment Logic ──────────────────────────────────────────────────────
+
+async def enrich_one(country: Dict[str, Any], limiter: TokenBucket) -> Optional[UpdateOne]:
+    cca3 = country.get("cca3")
+    try:
+        common_name = country["name"]["common"]
+    except (KeyError, TypeError):
+        # e.g. data imported with a plain string name, which the name.common projection drops
+        logger.error("  ✗ No common name for %s, skipping", cca3)
+        return None
+
+    logger.info("Enriching %s (%s)...", common_name, cca3)
+    prompt = PROMPT_TEMPLATE.format(common_name=common_name)
+
+    try:
+        cache_key = f"{GEMINI_MODEL}:{common_name}"
+        text = answer_cache.get(cache_key)
+        if text is None:
+            # 429 responses are retried with backoff inside generate_facts
+            text = await generate_facts(prompt, limiter)
+
+        # parse JSON
         try:
-            # Gemini API call
-            resp = gemini_client.models.generate_content(
-                model="gemini-1.5-flash",  # Use a valid model name
-                contents=prompt
-            )
-            request_count += 1  # Increment counter on successful request
-            text = resp.text
-
-            # parse JSON
-            try:
-                facts = normalize_fact_keys(text)
-            except Exception as e:
-                print(f"  ✗ Failed to parse JSON for {cca3}: {e}")
-                continue
-
-            # ensure it's JSON safe
-            facts = jsonable_encoder(facts)
-
-            # update MongoDB
-            result = await collection.update_one(
-                {"cca3": cca3},
-                {"$set": {"interestingFacts": facts}}
-            )
-
-            if result.modified_count:
-                print(f"  ✓ Updated {cca3}")
-            else:
-                print(f"  ⚠️ No document updated for {cca3}")
-
-        except genai.exceptions.ApiError as e:
-            if "429" in str(e):  # Rate limit error
-                retry_delay = 65  # Default retry delay in seconds
-                print(f"  ⚠️ Rate limit reached. Pausing for {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                # Try again after waiting
-                continue
-            else:
-                print(f"  ✗ API error for {cca3}: {e}")
-                continue
+            facts = normalize_fact_keys(text)
         except Exception as e:
-            print(f"  ✗ General error for {cca3}: {e}")
-            continue
+            logger.error("  ✗ Failed to parse JSON for %s: %s", cca3, e)
+            return None
+        # only keep answers that parsed, so a bad one is asked for again next run
+        answer_cache.set(cache_key, text)
+
+        # facts is already a dict of plain strings, safe to store as-is;
+        # the update is written to MongoDB with the next batch
+        logger.info("  ✓ Enriched %s", cca3)
+        return UpdateOne({"cca3": cca3}, {"$set": {"interestingFacts": facts}})
+
+    except APIError as e:
+        if is_rate_limited(e):
+            logger.warning("  ⚠️ Still rate limited after %s attempts, skipping %s", RATE_LIMIT_ATTEMPTS, cca3)
+        else:
+            logger.error("  ✗ API error for %s: %s", cca3, e)
+    except Exception as e:
+        logger.error("  ✗ General error for %s: %s", cca3, e)
+    return None
+
+
+async def flush_updates(pending: List[UpdateOne]) -> None:
+    """Write the queued updates to MongoDB in one unordered bulk write."""
+    if not pending:
+        return
+    ops = pending[:]
+    pending.clear()  # before awaiting, so concurrent tasks start a new batch
+
+    try:
+        result = await collection.bulk_write(ops, ordered=False)
+        logger.info("  ✓ Updated %s of %s countries", result.modified_count, len(ops))
+    except BulkWriteError as e:
+        logger.error("  ✗ Bulk write failed for %s of %s countries: %s", len(e.details["writeErrors"]), len(ops), e)
+    except PyMongoError as e:
+        # e.g. a dropped connection or timeout: log it and keep enriching the other countries
+        logger.error("  ✗ Bulk write failed for %s countries: %s", len(ops), e)
 
-    print("✅ Enrichment complete.")
+
+async def enrich_all_countries():
+    # Stream the countries in batches instead of loading the whole collection first,
+    # so enrichment starts with the first batch and memory stays bounded
+    cursor = collection.find({}, {"_id": 0, "name.common": 1, "cca3": 1}).batch_size(200)
+
+    # Bound the request rate instead of pausing after every 10 requests
+    limiter = TokenBucket(GEMINI_REQUESTS_PER_MIN)
+
+    # Updates are batched into bulk writes instead of one round trip per country
+    pending: List[UpdateOne] = []
+
+    # A fixed pool of workers bounds the calls in flight; the bounded queue keeps the
+    # cursor from being read further ahead than the workers can use
+    countries: asyncio.Queue = asyncio.Queue(maxsize=GEMINI_CONCURRENCY)
+
+    async def worker() -> None:
+        while (country := await countries.get()) is not None:
+            # a worker must outlive any one country, or the queue stops draining and the run hangs
+            try:
+                update = await enrich_one(country, limiter)
+                if update is not None:
+                    pending.append(update)
+                    if len(pending) >= BULK_WRITE_SIZE:
+                        await flush_updates(pending)
+            except Exception:
+                logger.exception("  ✗ Failed to enrich %s", country.get("cca3"))
+
+    workers = [asyncio.create_task(worker()) for _ in range(GEMINI_CONCURRENCY)]
+    try:
+        async for country in cursor:
+            await countries.put(country)
+    finally:
+        # also when reading the cursor fails: finish the queued countries and write what was enriched
+        for _ in workers:
+            await countries.put(None)  # tells a worker the cursor is exhausted
+        await asyncio.gather(*workers, return_exceptions=True)
+        await flush_updates(pending)
+
+        # cached API responses no longer include the latest facts
+        await publish_invalidation()
+
+    logger.info("✅ Enrichment complete.")
 
 # ─── Entry Point ────────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    asyncio.run(enrich_all_countries())
+    log_listener = start_logging()
+    try:
+        asyncio.run(enrich_all_countries())
+    finally:
+        log_listener.stop()  # flushes the queued records
     # loop = asyncio.get_event_loop()
     # loop.run_until_complete(enrich_all_countries())
     # loop.close()
@@ -0,0 +1,146 @@
+# Unit tests for the CRUD query builders
+import asyncio
+
+import pytest
+
+import app.crud as crud
+import app.routes.countries as routes
+from app.routes.countries import _stream_json
+
+
+@pytest.fixture
+def captured_pipeline(monkeypatch):
+    """Fixture that replaces the countries collection and records the aggregation pipeline."""
+    pipelines = []
+
+    class FakeCollection:
+        def aggregate(self, pipeline):
+            pipelines.append(pipeline)
+            return pipeline
+
+    monkeypatch.setattr(crud, "country_collection", FakeCollection())
+    return pipelines
+
+
+def stage_names(pipeline):
+    return [next(iter(stage)) for stage in pipeline]
+
+
+# Test that blank entries in the fields parameter are ignored
+def test_build_projection_skips_empty_fields():
+    assert crud.build_projection(" name, ,region,") == {"name": 1, "region": 1, "_id": 0}
+    assert crud.build_projection(" , ") == crud.build_projection(None)
+    assert crud.build_projection(None)["codes"] == crud.build_projection(None)["densityPerKm2"] == 0
+
+
+# Test that reshaping stages are never placed in front of $sort
+def test_aggregate_paged_stage_order(captured_pipeline):
+    crud._aggregate_paged(
+        match={"region": "Asia"},
+        sort={"population": -1},
+        skip=10,
+        limit=5,
+        add_fields={"density": {"$divide": ["$population", "$areaKm2"]}},
+        project={"name": 1},
+    )
+    assert stage_names(captured_pipeline[0]) == ["$match", "$sort", "$skip", "$limit", "$addFields", "$project"]
+
+
+# Test that density sorts on the precomputed, indexed field instead of an aggregation
+def test_sort_by_density_uses_stored_field(monkeypatch):
+    calls = {}
+
+    class FakeCursor:
+        def sort(self, key, direction):
+            calls["sort"] = (key, direction)
+            return self
+
+    class FakeCollection:
+        def find(self, query, projection):
+            calls["find"] = (query, projection)
+            return FakeCursor()
+
+    monkeypatch.setattr(crud, "country_collection", FakeCollection())
+    crud.sort_by_density("desc", crud.build_projection("population,areaKm2"))
+    assert calls["find"][0] == {"densityPerKm2": {"$ne": None}}
+    assert calls["sort"] == ("densityPerKm2", crud.DESCENDING)
+
+
+# Test that compared countries are sorted server-side in the order the codes were given
+def test_compare_countries_keeps_input_order(captured_pipeline):
+    crud.compare_countries(("IND", "USA"), crud.build_projection(None))
+    pipeline = captured_pipeline[0]
+    assert stage_names(pipeline) == ["$match", "$addFields", "$sort", "$project"]
+    assert pipeline[1]["$addFields"]["order"] == {"$indexOfArray": [["IND", "USA"], "$alpha3Code"]}
+    assert pipeline[3]["$project"]["order"] == 0
+
+
+# Test that capital lookups hit the lower-cased field, matching anywhere unless prefix is asked for
+def test_capital_prefix_uses_lowered_field(monkeypatch):
+    queries = []
+
+    class FakeCollection:
+        def find(self, query, projection):
+            queries.append(query)
+
+    monkeypatch.setattr(crud, "country_collection", FakeCollection())
+    crud.filter_by_capital("New D.", crud.build_projection(None), prefix=True)
+    crud.filter_by_capital("Delhi", crud.build_projection(None))
+    assert queries == [{"capital_lower": {"$regex": r"^new\ d\."}}, {"capital_lower": {"$regex": "delhi"}}]
+
+
+class FakeCursor:
+    """Async cursor over a list of documents, optionally failing on its first fetch like a bad query."""
+
+    def __init__(self, docs, error=None):
+        self.docs = iter(docs)
+        self.error = error
+
+    async def next(self):
+        if self.error:
+            raise self.error
+        try:
+            return next(self.docs)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    def __aiter__(self):
+        return self
+
+    __anext__ = next
+
+
+async def read_body(response):
+    return b"".join([chunk async for chunk in response.body_iterator])
+
+
+# Test that a failing query raises before the streamed response is created
+def test_stream_json_raises_query_errors_up_front():
+    with pytest.raises(RuntimeError):
+        asyncio.run(_stream_json(FakeCursor([], error=RuntimeError("path collision"))))
+
+
+# Test that streamed results form a JSON array, empty or not
+def test_stream_json_body():
+    response = asyncio.run(_stream_json(FakeCursor([])))
+    assert response.body == b"[]"
+
+    async def stream():
+        return await read_body(await _stream_json(FakeCursor([{"a": 1}, {"a": 2}])))
+
+    assert asyncio.run(stream()) == b'[{"a":1},{"a":2}]'
+
+
+# Test that the admin endpoints are disabled without a token and reject a wrong one
+def test_require_admin_token(monkeypatch):
+    monkeypatch.setattr(routes, "ADMIN_TOKEN", None)
+    with pytest.raises(routes.HTTPException) as disabled:
+        routes.require_admin_token("anything")
+    assert disabled.value.status_code == 404
+
+    monkeypatch.setattr(routes, "ADMIN_TOKEN", "s3cret")
+    for token in (None, "wrong"):
+        with pytest.raises(routes.HTTPException) as rejected:
+            routes.require_admin_token(token)
+        assert rejected.value.status_code == 403
+    routes.require_admin_token("s3cret")
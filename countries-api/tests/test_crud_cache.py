@@ -0,0 +1,71 @@
+# Unit tests for the in-process CRUD caches
+import asyncio
+
+from app.crud_cache import cached, clear_caches, single_flight
+
+
+def make_counted(delay=0.0):
+    """Return an async function that records its calls, and the list of recorded calls."""
+    calls = []
+
+    async def lookup(code, projection=None):
+        calls.append(code)
+        await asyncio.sleep(delay)
+        return {"code": code}
+
+    return lookup, calls
+
+
+# Test that a repeated call is served from the cache
+def test_cached_hit():
+    lookup, calls = make_counted()
+    cached_lookup = cached(ttl=60)(lookup)
+
+    async def run():
+        first = await cached_lookup("IND", projection={"name": 1})
+        second = await cached_lookup("IND", projection={"name": 1})
+        return first, second
+
+    assert asyncio.run(run()) == ({"code": "IND"}, {"code": "IND"})
+    assert calls == ["IND"]
+
+
+# Test that different arguments and cleared caches miss
+def test_cached_miss():
+    lookup, calls = make_counted()
+    cached_lookup = cached(ttl=60)(lookup)
+
+    async def run():
+        await cached_lookup("IND")
+        await cached_lookup("USA")
+        clear_caches()
+        await cached_lookup("IND")
+
+    asyncio.run(run())
+    assert calls == ["IND", "USA", "IND"]
+
+
+# Test that concurrent misses for the same key run the query once
+def test_cached_coalesces_concurrent_misses():
+    lookup, calls = make_counted(delay=0.01)
+    cached_lookup = cached(ttl=60)(lookup)
+
+    async def run():
+        return await asyncio.gather(*(cached_lookup("IND") for _ in range(5)))
+
+    assert asyncio.run(run()) == [{"code": "IND"}] * 5
+    assert calls == ["IND"]
+
+
+# Test that concurrent identical calls share one query, and later calls start a new one
+def test_single_flight_coalesces_concurrent_calls():
+    lookup, calls = make_counted(delay=0.01)
+    shared_lookup = single_flight(lookup)
+
+    async def run():
+        results = await asyncio.gather(*(shared_lookup("IND") for _ in range(5)), shared_lookup("USA"))
+        await shared_lookup("IND")
+        return results
+
+    assert asyncio.run(run()) == [{"code": "IND"}] * 5 + [{"code": "USA"}]
+    assert calls == ["IND", "USA", "IND"]
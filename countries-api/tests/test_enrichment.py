@@ -0,0 +1,31 @@
+# Unit tests for parsing Gemini's replies in the enrichment script
+import importlib
+
+import pytest
+
+
+@pytest.fixture
+def enrichment(monkeypatch):
+    """Fixture that imports the enrichment script, which needs its optional dependencies and an API key."""
+    for module in ("diskcache", "google.genai", "tenacity"):
+        pytest.importorskip(module)
+    monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    return importlib.import_module("app.utils.enrichment")
+
+
+# Test that a ```json fence is removed
+def test_parse_facts_json_json_fence(enrichment):
+    reply = '```json\n{"history and heritage": "Founded in 1947"}\n```'
+    assert enrichment.parse_facts_json(reply) == {"history and heritage": "Founded in 1947"}
+
+
+# Test that a bare ``` fence is removed
+def test_parse_facts_json_bare_fence(enrichment):
+    reply = '```\n{"food and cuisine": "Biryani"}\n```  '
+    assert enrichment.parse_facts_json(reply) == {"food and cuisine": "Biryani"}
+
+
+# Test that j/s/o/n characters at the edges of the content are kept
+def test_parse_facts_json_keeps_jsonish_edges(enrichment):
+    assert enrichment.parse_facts_json('{"json": "son"}') == {"json": "son"}
+    assert enrichment.parse_facts_json('```json{"n": "sojourn"}```') == {"n": "sojourn"}
@@ -1,5 +1,7 @@
 # Dictionary to map alphabets/numbers to Morse code
-from utils import save_to_json_file, load_from_json_file
+from functools import lru_cache
+
+from utils import append_user_defined_morse_code, data_file_version, load_from_json_file
 
 MORSE_CODE_JSON_FILE = "morse_code_data.json"
 
@@ -32,10 +34,11 @@ def get_morse_code_dict() -> dict:
     """
 
     data = load_from_json_file(MORSE_CODE_JSON_FILE)
-    return data
+
+    # Hand out copies so callers can update their dictionaries without touching the cached data
+    return {code_definition: dict(morse_code) for code_definition, morse_code in data.items()}
 
 
-# Inverted dictionary for reverse translation (Morse code to text)
 def get_reverse_morse_code_dict() -> dict:
     """
     Return a dictionary that maps Morse code to their corresponding characters.
@@ -45,20 +48,26 @@ def get_reverse_morse_code_dict() -> dict:
         dict: A dictionary mapping Morse code to characters.
     """
 
-    morse_code_dict = get_morse_code_dict()
-    # reverse_morse_code_dict = {code_definition: {code: char for char, code in morse_code.items()} for code_definition, morse_code in morse_code_dict.items()}  # One-liner dictionary comprehension for getting reversed version of Morse code dictionary
+    reverse_morse_code_dict = _build_reverse_morse_code_dict(data_file_version(MORSE_CODE_JSON_FILE))
 
-    reverse_morse_code_dict = {}
+    # Hand out copies so callers can update their dictionaries without touching the cache
+    return {code_definition: dict(morse_code) for code_definition, morse_code in reverse_morse_code_dict.items()}
 
-    for code_definition, morse_code in morse_code_dict.items():
-        new_department = {}
 
-        for char, code in morse_code.items():
-            new_department[code] = char
+@lru_cache(maxsize=1)
+def _build_reverse_morse_code_dict(mtime: tuple) -> dict:
+    """
+    Load the Morse code dictionary and invert it, once per version of the data file.
 
-        reverse_morse_code_dict[code_definition] = new_department
+    Args:
+        mtime (tuple): Modification times of the data file and its sidecar, used as the cache key.
 
-    return reverse_morse_code_dict
+    Returns:
+        dict: A dictionary mapping Morse code to characters.
+    """
+
+    morse_code_dict = get_morse_code_dict()
+    return {code_definition: {code: char for char, code in morse_code.items()} for code_definition, morse_code in morse_code_dict.items()}
 
 
 # Optional: Function to customize Morse code dictionary (if necessary)
@@ -73,9 +82,11 @@ def add_custom_morse_code(mapping: dict) -> dict:
         dict: The updated Morse code dictionary with the custom mappings added.
     """
 
-    morse_code_dict = load_from_json_file(MORSE_CODE_JSON_FILE)
-    morse_code_dict["user_defined_morse_code"].update(mapping)
-    save_to_json_file(MORSE_CODE_JSON_FILE, morse_code_dict)
+    # Append only the new entries; the full data file is not rewritten
+    append_user_defined_morse_code(MORSE_CODE_JSON_FILE, mapping)
+
+    # The file changed; don't rely on the modification time alone, its resolution may be coarse
+    _build_reverse_morse_code_dict.cache_clear()
 
     return mapping
 
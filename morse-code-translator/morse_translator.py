@@ -10,6 +10,27 @@ class MorseTranslator:
         self.morse_code_dict = morse_code_map.get_morse_code_dict()
         self.reverse_morse_code_dict = morse_code_map.get_reverse_morse_code_dict()
 
+        # Pre-defined characters and codes, which custom codes may not redefine; they never change
+        self._predefined_chars = frozenset(self.morse_code_dict["pre_defined_morse_code"])
+        self._predefined_codes = frozenset(self.reverse_morse_code_dict["pre_defined_morse_code"])
+
+        self._rebuild_caches()
+
+    def _rebuild_caches(self) -> None:
+        """Merge the pre-defined and user-defined Morse codes once, instead of on every translation."""
+
+        self._fwd = {**self.morse_code_dict["pre_defined_morse_code"], **self.morse_code_dict.get("user_defined_morse_code", {})}
+        self._rev = {**self.reverse_morse_code_dict["pre_defined_morse_code"], **self.reverse_morse_code_dict.get("user_defined_morse_code", {})}
+
+        # Token-to-text table for decoding; the "/" word separator decodes to a space
+        self._decode = {**self._rev, '/': ' '}
+
+        # str.translate table: each character becomes its code followed by the separating space
+        self._translate_table = {ord(char): code + ' ' for char, code in self._fwd.items()}
+
+        # str.translate table deleting every supported character; whatever is left is invalid
+        self._delete_table = dict.fromkeys(map(ord, self._fwd))
+
     def translate_to_morse(self, text: str) -> str:
         """
         Translate the input text into Morse code.
@@ -21,14 +42,14 @@ class MorseTranslator:
             str: The translated Morse code.
         """
 
-        # Validate input text using pre-defined and user-defined Morse codes
-        valid_characters = {**self.morse_code_dict["pre_defined_morse_code"], **self.morse_code_dict.get("user_defined_morse_code", {})}
+        text = text.upper()  # Convert to uppercase for consistency
 
-        if utils.is_valid_text(text, valid_characters):
-            text = text.upper()  # Convert to uppercase for consistency
-            morse_code = [valid_characters[char] for char in text if char in valid_characters]
+        # Validate input text using pre-defined and user-defined Morse codes.
+        # Two str.translate passes in C are faster than a fused per-character loop in Python.
+        if not text.translate(self._delete_table):
+            morse_code = text.translate(self._translate_table).rstrip()
 
-            return f"Morse Code: {' '.join(morse_code)}"
+            return f"Morse Code: {morse_code}"
             # return f"Morse Code: {' '.join(self.morse_code_dict["pre_defined_morse_code"][char] for char in text.upper() if char in self.morse_code_dict["pre_defined_morse_code"])}"  # Another one liner logic for this function
 
         else:
@@ -46,19 +67,14 @@ class MorseTranslator:
             str: Translated text.
         """
 
-        # Merge both pre-defined and user-defined Morse codes for reverse lookup
-        combined_reverse_morse_code = {**self.reverse_morse_code_dict["pre_defined_morse_code"], **self.reverse_morse_code_dict.get("user_defined_morse_code", {})}
-
-        # Validate the Morse code input using both dictionaries
-        if utils.is_valid_morse_code(morse_code, combined_reverse_morse_code):
-            words = morse_code.split(" / ")  # Words are separated by " / "
-            decoded_message = []
+        # Letters are separated by spaces, words by " / "; "/" tokens become the spaces between words.
+        # Decoding and validation share one pass: unknown codes come back as None.
+        decoded = list(map(self._decode.get, morse_code.split()))
 
-            for word in words:
-                decoded_word = ''.join([combined_reverse_morse_code[char] for char in word.split() if char in combined_reverse_morse_code])
-                decoded_message.append(decoded_word)
+        if None not in decoded:
+            decoded_message = ''.join(decoded)
 
-            return f"Decoded Text: {' '.join(decoded_message)}"
+            return f"Decoded Text: {decoded_message}"
             # return f"Decoded Text: {''.join(self.reverse_morse_code_dict[code] for code in morse_code.split() if code in self.reverse_morse_code_dict)}"  # Another one liner logic for this function
 
         else:
@@ -82,22 +98,26 @@ class MorseTranslator:
             user_char = input("Enter the character you want to define Morse code for: ").strip().upper()
             user_morse = input(f"Enter the Morse code for '{user_char}': ").strip()
 
-            if utils.is_valid_text(user_char, self.morse_code_dict["pre_defined_morse_code"]) and utils.is_valid_morse_code(user_morse, self.reverse_morse_code_dict["pre_defined_morse_code"]):
+            if utils.is_valid_text(user_char, self._predefined_chars, assume_upper=True) and utils.is_valid_morse_code(user_morse, self._predefined_codes):
                 result_messages.append(f"Your entered character '{user_char}' or Morse code '{user_morse}' is predefined. Please enter a different value.")
 
             else:
                 if len(user_char) == 1:
                     user_dict[user_char] = user_morse
-
-                    custom_code = morse_code_map.add_custom_morse_code(user_dict)
-                    char = list(custom_code.keys())[0]
-                    morse_code = custom_code[char]
-
-                    result_messages.append(f"Custom Morse code added: {char} -> {morse_code}")
+                    result_messages.append(f"Custom Morse code added: {user_char} -> {user_morse}")
 
                 else:
                     result_messages.append("Please enter a single character for custom Morse code.")
 
+        if user_dict:
+            # Save all entries with a single write of the data file
+            custom_codes = morse_code_map.add_custom_morse_code(user_dict)
+
+            # Make the new codes usable by this translator straight away
+            self.morse_code_dict.setdefault("user_defined_morse_code", {}).update(custom_codes)
+            self.reverse_morse_code_dict.setdefault("user_defined_morse_code", {}).update({code: char for char, code in custom_codes.items()})
+            self._rebuild_caches()
+
         return "\n".join(result_messages) if result_messages else "No custom Morse codes were added."
 
 
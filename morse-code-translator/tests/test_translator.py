@@ -103,6 +103,30 @@ def test_add_custom_morse_code_valid(mock_morse_translator, mock_custom_code, mo
     assert result == expected_message
 
 
+# Test that an added custom Morse code can be used for translation right away
+def test_add_custom_morse_code_updates_translations(mock_morse_translator, mock_custom_code, monkeypatch):
+    input_values = iter(['!', '--.--'])
+    monkeypatch.setattr('builtins.input', lambda _: next(input_values))
+
+    mock_morse_translator.add_user_defined_morse_code(1)
+
+    assert mock_morse_translator.translate_to_morse("A!") == "Morse Code: .- --.--"
+    assert mock_morse_translator.translate_from_morse(".- --.--") == "Decoded Text: A!"
+
+
+# Test that several custom Morse codes are saved together
+def test_add_custom_morse_code_single_write(mock_morse_translator, monkeypatch):
+    saved = []
+    monkeypatch.setattr('data.morse_code_map.add_custom_morse_code', lambda mapping: saved.append(dict(mapping)) or mapping)
+    input_values = iter(['!', '--.--', '@', '.--.-.'])
+    monkeypatch.setattr('builtins.input', lambda _: next(input_values))
+
+    result = mock_morse_translator.add_user_defined_morse_code(2)
+
+    assert saved == [{'!': '--.--', '@': '.--.-.'}]
+    assert result == "Custom Morse code added: ! -> --.--\nCustom Morse code added: @ -> .--.-."
+
+
 # Test for handling duplicate custom Morse code
 def test_add_custom_morse_code_duplicate(mock_morse_translator, mock_custom_code, monkeypatch):
     # Mock user input for predefined character 'A' and Morse code '.-'
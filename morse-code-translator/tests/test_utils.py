@@ -0,0 +1,65 @@
+# Unit tests for loading and saving the Morse code data file
+import pytest
+
+import utils
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Fixture that points the data files at a temporary directory holding a small data file."""
+    monkeypatch.setattr(utils, "DATA_DIR", tmp_path)
+    utils._load_cached.cache_clear()
+    (tmp_path / "codes.json").write_text('{"pre_defined_morse_code": {"A": ".-"}, "user_defined_morse_code": {}}')
+
+    yield tmp_path
+
+    utils._load_cached.cache_clear()
+
+
+# Test that appended custom codes are merged into the loaded data
+def test_append_then_load_merges_sidecar(data_dir):
+    utils.append_user_defined_morse_code("codes.json", {"#": "......", "%": ".-.-.-."})
+
+    data = utils.load_from_json_file("codes.json")
+    assert data["user_defined_morse_code"] == {"#": "......", "%": ".-.-.-."}
+    assert data["pre_defined_morse_code"] == {"A": ".-"}
+    assert (data_dir / "codes.jsonl").read_text().splitlines() == ['{"#":"......"}', '{"%":".-.-.-."}']
+
+
+# Test that a later line for the same character overrides an earlier one
+def test_later_sidecar_lines_override_earlier_ones(data_dir):
+    utils.append_user_defined_morse_code("codes.json", {"#": "......"})
+    utils.append_user_defined_morse_code("codes.json", {"#": "-.-.-."})
+
+    assert utils.load_from_json_file("codes.json")["user_defined_morse_code"] == {"#": "-.-.-."}
+
+
+# Test that writing either file invalidates the cached data
+def test_cache_invalidated_by_append_and_save(data_dir):
+    assert utils.load_from_json_file("codes.json")["user_defined_morse_code"] == {}
+
+    utils.append_user_defined_morse_code("codes.json", {"#": "......"})
+    data = utils.load_from_json_file("codes.json")
+    assert data["user_defined_morse_code"] == {"#": "......"}
+
+    utils.save_to_json_file("codes.json", {**data, "user_defined_morse_code": {}})
+    assert utils.load_from_json_file("codes.json")["user_defined_morse_code"] == {}
+
+
+# Test that a full save folds the sidecar into the data file
+def test_save_removes_sidecar(data_dir):
+    utils.append_user_defined_morse_code("codes.json", {"#": "......"})
+
+    utils.save_to_json_file("codes.json", utils.load_from_json_file("codes.json"))
+
+    assert not (data_dir / "codes.jsonl").exists()
+    assert utils.load_from_json_file("codes.json")["user_defined_morse_code"] == {"#": "......"}
+
+
+# Test that saving keeps the permissions of the file it replaces
+def test_save_keeps_file_mode(data_dir):
+    (data_dir / "codes.json").chmod(0o644)
+
+    utils.save_to_json_file("codes.json", utils.load_from_json_file("codes.json"))
+
+    assert (data_dir / "codes.json").stat().st_mode & 0o777 == 0o644